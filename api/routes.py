@@ -1,7 +1,8 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from fastapi.responses import RedirectResponse, ORJSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import asyncio
 import os
 import time
 from datetime import datetime, timezone
@@ -36,12 +37,60 @@ class BookResponse(BaseModel):
     rating: Optional[str] = None
     description: Optional[str] = None
 
-router = APIRouter()
 scraper = WebScraper()
 
+
+def sync_scraper_state():
+    """
+    Sincroniza o estado do scraper com os demais workers antes de cada requisição.
+    
+    Dependência síncrona: o FastAPI a executa no threadpool, já que a sincronização
+    lê arquivos e pode recarregar a base inteira, sem bloquear o event loop.
+    """
+    scraper.sync_shared_state()
+
+
+router = APIRouter(dependencies=[Depends(sync_scraper_state)])
+
 # Variável para controlar o tempo de início da aplicação
 app_start_time = time.time()
 
+# Cache do os.stat da base de dados usado pelo health check
+DATABASE_STAT_TTL_SECONDS = 5
+_database_stat_cache = {"stat": None, "expires_at": 0.0}
+
+
+async def get_database_stat() -> Optional[os.stat_result]:
+    """
+    Retorna o os.stat do arquivo da base de dados, ou None se ele não existir.
+    
+    A chamada roda fora do event loop e o resultado é reaproveitado por alguns
+    segundos, evitando acesso a disco a cada consulta de monitoramento.
+    """
+    now = time.monotonic()
+    if now >= _database_stat_cache["expires_at"]:
+        try:
+            stat = await asyncio.to_thread(os.stat, scraper.SCRAPING_DATABASE_FILE)
+        except OSError:
+            stat = None
+        _database_stat_cache.update(stat=stat, expires_at=now + DATABASE_STAT_TTL_SECONDS)
+    return _database_stat_cache["stat"]
+
+# Cache HTTP das rotas de livros, validado pelo ETag da versão atual da base
+BOOKS_CACHE_CONTROL = "public, max-age=60"
+
+
+def get_books_cache_headers() -> Dict[str, str]:
+    """Retorna os cabeçalhos de cache HTTP das rotas de livros."""
+    return {"ETag": scraper.state.dataset_etag, "Cache-Control": BOOKS_CACHE_CONTROL}
+
+
+def get_not_modified_response(request: Request) -> Optional[Response]:
+    """Retorna uma resposta 304 se o cliente já possui a versão atual da base."""
+    if request.headers.get("if-none-match") == scraper.state.dataset_etag:
+        return Response(status_code=304, headers=get_books_cache_headers())
+    return None
+
 
 @router.get(
     "/",
@@ -61,7 +110,7 @@ async def root():
     description="Retorna o status atual do processo de scraping",
     tags=["Scraping"]
 )
-def get_scraping_status():
+async def get_scraping_status():
     """
     **Obtém o status atual do scraping**
     
@@ -73,7 +122,7 @@ def get_scraping_status():
         "status": scraper.state.status,
         "message": scraper.get_status_message()
     }
-    return JSONResponse(content=data)
+    return ORJSONResponse(content=data)
 
 @router.get(
     "/api/v1/scraper/start",
@@ -82,7 +131,7 @@ def get_scraping_status():
     description="Inicia o processo de scraping em background para coletar dados de livros do site.",
     tags=["Scraping"]
 )
-def start_scraping(background_tasks: BackgroundTasks):
+async def start_scraping(background_tasks: BackgroundTasks):
     """
     **Inicia o processo de scraping de livros**
     
@@ -91,6 +140,8 @@ def start_scraping(background_tasks: BackgroundTasks):
     - O processo roda de forma assíncrona sem bloquear a API
     """
     if scraper.state.status == "Idle":
+        if not await asyncio.to_thread(scraper.claim_scraping):
+            return {"message": "Scraping em andamento. Aguarde a conclusão para acessar os dados dos livros."}
         background_tasks.add_task(scraper.scraper_task)
         return {"message": "Scraping iniciado em background."}
     return {"message": scraper.get_status_message()}
@@ -102,7 +153,7 @@ def start_scraping(background_tasks: BackgroundTasks):
     description="Para o processo de scraping (se estiver rodando) e limpa toda a base de dados coletada.",
     tags=["Scraping"]
 )
-def reset_scraping():
+async def reset_scraping():
     """
     **Reseta o processo de scraping**
     
@@ -112,12 +163,17 @@ def reset_scraping():
     - Retorna o status para 'Idle'
     
     """
-    if scraper.state.status in ["Running", "Extracting_urls", "Scraping_books"]:
-        scraper.state.status = "Stopping"
-        while scraper.state.status == "Stopping":
-            pass  # Esperar a task de scraping parar
-    scraper.delete_database()
-    scraper.state.status = "Idle"
+    # "Stopping" também aguarda: um reset anterior pode ter expirado com a task ainda em execução
+    if scraper.state.status in scraper.RUNNING_STATUSES + ("Stopping",):
+        scraper.stop_scraping()
+        # Aguarda a task de scraping parar sem bloquear o event loop
+        stopped = await asyncio.to_thread(scraper.wait_until_stopped, scraper.STOP_TIMEOUT_SECONDS)
+        if not stopped:
+            return {"message": "O scraping não parou a tempo. Tente novamente em alguns instantes."}
+    await asyncio.to_thread(scraper.delete_database)
+    _database_stat_cache["expires_at"] = 0.0
+    if scraper.state.stopped_event.is_set():
+        scraper.state.status = "Idle"
     scraper.state.qtd_books_urls = 0
     return {"message": "Base de dados de scraping apagada com sucesso."}
 
@@ -126,23 +182,39 @@ def reset_scraping():
     "/api/v1/books",
     response_model=List[str],
     summary="Listar Títulos dos Livros",
-    description="Retorna uma lista com todos os títulos dos livros coletados pelo scraping.",
+    description="Retorna uma lista paginada com os títulos dos livros coletados pelo scraping.",
     tags=["Livros"]
 )
-async def get_books_titles():
+async def get_books_titles(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000, description="Quantidade máxima de títulos retornados"),
+    offset: int = Query(0, ge=0, description="Quantidade de títulos a pular")
+):
     """
-    **Obtém lista de títulos de todos os livros**
+    **Obtém lista de títulos dos livros**
     
-    - Retorna apenas os títulos dos livros coletados
+    - Retorna apenas os títulos dos livros coletados, paginados por `limit` e `offset`
+    - O total de títulos é informado no cabeçalho `X-Total-Count`
     - Requer que o scraping tenha sido concluído (status 'Done')
     - Útil para obter uma visão geral rápida do catálogo
+    - Suporta `If-None-Match`: retorna 304 se a base não mudou
     """
     if scraper.state.status != "Done":
         data = {"message": scraper.get_status_message()}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
     
-    titles = scraper.get_book_titles()
-    return JSONResponse(content=titles)
+    not_modified = get_not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
+    
+    titles = scraper.state.titles
+    headers = {**get_books_cache_headers(), "X-Total-Count": str(len(titles))}
+    
+    # Página com todos os títulos: lista serializada uma única vez ao final do scraping
+    if offset == 0 and limit >= len(titles):
+        return Response(content=scraper.state.titles_json, media_type="application/json", headers=headers)
+    
+    return ORJSONResponse(content=titles[offset:offset + limit], headers=headers)
 
 
 @router.get(
@@ -153,8 +225,11 @@ async def get_books_titles():
     tags=["Livros"]
 )
 async def get_books_search(
+    request: Request,
     title: Optional[str] = Query(None, description="Filtrar por título"),
-    category: Optional[str] = Query(None, description="Filtrar por categoria")
+    category: Optional[str] = Query(None, description="Filtrar por categoria"),
+    limit: int = Query(100, ge=1, le=1000, description="Quantidade máxima de livros retornados"),
+    offset: int = Query(0, ge=0, description="Quantidade de livros a pular")
 ):
     """
     **Busca livros com filtros opcionais**
@@ -162,6 +237,9 @@ async def get_books_search(
     Parâmetros de busca:
     - **title**: Busca parcial por título (case insensitive)
     - **category**: Busca parcial por categoria (case insensitive)
+    - **limit**: Quantidade máxima de livros retornados (padrão 100)
+    - **offset**: Quantidade de livros a pular (padrão 0)
+    - O total de livros encontrados é informado no cabeçalho `X-Total-Count`
     
     Exemplos de uso:
     - `/api/v1/books/search?title=python` - livros com "python" no título
@@ -170,12 +248,16 @@ async def get_books_search(
     """
     if scraper.state.status != "Done":
         data = {"message": scraper.get_status_message()}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
     
-    results = scraper.search_books(title=title, category=category)
+    not_modified = get_not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
+    
+    positions = scraper.search_book_positions(title=title, category=category)
     
     # Verificar se encontrou resultados
-    if not results:
+    if len(positions) == 0:
         # Construir mensagem informativa baseada nos filtros aplicados
         filters_applied = []
         if title:
@@ -190,9 +272,12 @@ async def get_books_search(
             message = "Nenhum livro encontrado. Verifique se o scraping foi concluído."
         
         data = {"message": message}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data, headers=get_books_cache_headers())
     
-    return JSONResponse(content=results)
+    # Resposta montada a partir do JSON de cada livro, serializado ao final do scraping
+    headers = {**get_books_cache_headers(), "X-Total-Count": str(len(positions))}
+    content = scraper.get_books_json(positions[offset:offset + limit])
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 
@@ -204,7 +289,7 @@ async def get_books_search(
     description="Retorna todas as categorias únicas encontradas nos livros coletados.",
     tags=["Livros"]
 )
-async def get_categories():
+async def get_categories(request: Request):
     """
     **Obtém lista de todas as categorias disponíveis**
     
@@ -214,14 +299,18 @@ async def get_categories():
     """
     if scraper.state.status != "Done":
         data = {"message": scraper.get_status_message()}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
 
     if 'category' not in scraper.state.books_dataframe.columns:
         data = {"message": "A coluna 'category' não foi encontrada na base de dados."}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
+    
+    not_modified = get_not_modified_response(request)
+    if not_modified is not None:
+        return not_modified
     
-    categories = {"categories": sorted(scraper.state.books_dataframe['category'].unique().tolist())}
-    return JSONResponse(content=categories)
+    # Lista ordenada e serializada uma única vez ao final do scraping
+    return Response(content=scraper.state.categories_json, media_type="application/json", headers=get_books_cache_headers())
 
 
 
@@ -254,21 +343,21 @@ async def health_check():
     
     # Status do scraping e quantidade de livros
     scraping_status = scraper.get_status_message()
-    books_count = scraper.state.qtd_books_urls if hasattr(scraper.state, 'qtd_books_urls') else 0
+    books_count = scraper.state.qtd_books_urls
     
     # Informações do arquivo CSV
     csv_size_mb = None
     csv_creation_date = None
     
-    database_path = scraper.SCRAPING_DATABASE_FILE
     try:
-        if os.path.exists(database_path):
+        database_stat = await get_database_stat()
+        if database_stat is not None:
             # Tamanho do arquivo em MB
-            size_bytes = os.path.getsize(database_path)
+            size_bytes = database_stat.st_size
             csv_size_mb = round(size_bytes / (1024 * 1024), 3)
             
             # Data de criação do arquivo com fuso horário local
-            creation_timestamp = os.path.getctime(database_path)
+            creation_timestamp = database_stat.st_ctime
             
             # Detectar fuso horário local automaticamente
             try:
@@ -307,7 +396,7 @@ async def health_check():
     }
     
     # Retorna JSON com indentação para melhor legibilidade
-    return JSONResponse(content=data, headers={"Content-Type": "application/json; charset=utf-8"})
+    return ORJSONResponse(content=data, headers={"Content-Type": "application/json; charset=utf-8"})
     
 
 @router.get(
@@ -342,7 +431,7 @@ async def health_check():
         }
     }
 )
-async def get_book_by_id(id: int):
+async def get_book_by_id(id: int, request: Request):
     """
     **Obtém detalhes completos de um livro por ID**
     
@@ -359,18 +448,22 @@ async def get_book_by_id(id: int):
     """
     if scraper.state.status != "Done":
         data = {"message": scraper.get_status_message()}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
 
-    # Verificar se o DataFrame existe e tem dados
-    if not hasattr(scraper.state, 'books_dataframe') or scraper.state.books_dataframe.empty:
+    # Verificar se existem livros coletados
+    if not scraper.state.books_json:
         data = {"message": "Nenhum livro foi coletado ainda. Execute o scraping primeiro."}
-        return JSONResponse(content=data)
+        return ORJSONResponse(content=data)
     
-    total_books = len(scraper.state.books_dataframe)
+    total_books = len(scraper.state.books_json)
     
     if id >= 0 and id < total_books:
-        book_data = scraper.state.books_dataframe.iloc[id].to_dict()
-        return JSONResponse(content=book_data)
+        not_modified = get_not_modified_response(request)
+        if not_modified is not None:
+            return not_modified
+        
+        # Livro serializado uma única vez ao final do scraping
+        return Response(content=scraper.state.books_json[id], media_type="application/json", headers=get_books_cache_headers())
     else:
         raise HTTPException(
             status_code=404, 
@@ -1,8 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from api.routes import router
+from fastapi.responses import ORJSONResponse
+from api.routes import router, scraper
+import asyncio
 import uvicorn
 import os
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carrega a base de dados existente ao iniciar cada worker (e não na importação)."""
+    await asyncio.to_thread(scraper.load_existing_data)
+    yield
+    # Fecha as conexões HTTP mantidas abertas pelo scraper
+    scraper.close()
+
+
 app = FastAPI(
     title="Books Scraper API",
     description="""
@@ -26,6 +39,8 @@ app = FastAPI(
     - **Sistema**: Monitoramento e health checks
     """,
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
     contact={
         "name": "Gabriel Wense",
         "email": "gabriel.wense@gmail.com",
@@ -38,4 +53,7 @@ app.include_router(router)
 if __name__ == "__main__":
     host = os.getenv("HOST", "0.0.0.0")
     port = int(os.getenv("PORT", 8001))
-    uvicorn.run(app, host=host, port=port)
+    workers = int(os.getenv("WORKERS", 1))
+    log_level = os.getenv("LOG_LEVEL", "info")
+    # Com uvicorn[standard], uvloop e httptools são selecionados automaticamente (loop/http "auto")
+    uvicorn.run("main:app", host=host, port=port, workers=workers, log_level=log_level)
@@ -1,7 +1,17 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import os
+import re
+import multiprocessing
+from html import unescape
+from urllib.parse import urljoin
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import closing
 
 
 # Parametros configuráveis da página
@@ -12,70 +22,130 @@ nome_link_books = 'Books'
 class_category = 'breadcrumb'
 category_link_number = 3
 
-scraping_database_file = './data/scraping_books_database.csv'
+# Arquivo próprio do script: não pode coincidir com a cópia em Parquet da base usada pela API
+scraping_database_file = './data/legacy_books_database.parquet'
+
+# Schema da base em Parquet (tipos definidos, sem inferência a cada lote)
+# Preço e taxa ficam em float64 para não perder precisão nos valores em libras
+books_schema = pa.schema([
+    ('index', pa.int32()),
+    ('title', pa.string()),
+    ('category', pa.string()),
+    ('image_url', pa.string()),
+    ('rating', pa.int32()),
+    ('upc', pa.string()),
+    ('price', pa.float64()),
+    ('tax', pa.float64()),
+    ('stock', pa.int32()),
+    ('reviews', pa.int32()),
+    ('description', pa.string()),
+])
+
+# Quantidade de livros acumulados antes de gravar um lote no arquivo
+parquet_batch_size = 50
+
+# Tipos compactos das colunas do dataframe em memória
+# - Inteiros pequenos com tipos nullable (aceitam campos vazios quando a página do livro não é baixada)
+# - Categoria com poucos valores distintos como 'category'
+# Preço e taxa continuam em float64 para não perder precisão nos valores em libras
+books_dtypes = {
+    'index': 'int32',
+    'rating': 'Int8',
+    'stock': 'Int16',
+    'reviews': 'Int32',
+    'category': 'category',
+    'upc': 'string',
+}
+
+# Timeout (em segundos) das requisições HTTP
+request_timeout = (3, 10)
+
+# Quantidade de páginas de livros baixadas em paralelo
+max_workers = 32
+
+# Quantidade de processos que extraem os dados das páginas baixadas (parsing usa CPU e fica preso ao GIL em threads)
+parse_workers = os.cpu_count() or 1
+
+# Parser usado pelo BeautifulSoup: o lxml (em C) monta a árvore bem mais rápido que o 'html.parser'
+soup_parser = 'lxml'
+
+# Sessão HTTP compartilhada por todas as requisições do scraping
+# - Mantém as conexões abertas (keep-alive), evitando um novo handshake TCP/TLS a cada página
+# - Refaz automaticamente requisições que falharem (conexão ou status 429/5xx), com backoff exponencial entre as tentativas
+_SESSION = requests.Session()
+_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+_ADAPTER = HTTPAdapter(pool_connections=1, pool_maxsize=64, max_retries=_RETRY)
+_SESSION.mount("https://", _ADAPTER)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+# Encoding das páginas do site (declarado no <meta charset>), usado no lugar da detecção automática
+site_encoding = 'utf-8'
+
+
+
+# Converte as colunas do dataframe de livros para os tipos compactos definidos em books_dtypes
+def otimiza_tipos (books_dataframe):
+    return books_dataframe.astype({coluna: tipo for coluna, tipo in books_dtypes.items() if coluna in books_dataframe.columns})
 
 
 # Funcoes de extracao de dados de livros
 
 def web_scraping_data_init():
     
-    web_scraping_data = {}
+    # As chaves de status sempre existem, mesmo quando a base não existe ou está vazia
+    web_scraping_data = {
+        "scraping_status": "Idle",
+        "books_dataframe": pd.DataFrame(),
+        "qtd_books": 0,
+        "qtd_scraped": 0,
+    }
 
     try:
-        web_scraping_data["books_dataframe"] = pd.read_csv(scraping_database_file)
+        web_scraping_data["books_dataframe"] = otimiza_tipos(pd.read_parquet(scraping_database_file))
         if len(web_scraping_data["books_dataframe"]) > 0:
             web_scraping_data["scraping_status"] = "Done"
             web_scraping_data["qtd_books"] = len(web_scraping_data["books_dataframe"])
+            web_scraping_data["qtd_scraped"] = web_scraping_data["qtd_books"]
     except FileNotFoundError:
-        web_scraping_data["scraping_status"] = "Idle"
-        web_scraping_data["books_dataframe"] = pd.DataFrame()
-        web_scraping_data["qtd_books"] = 0
+        pass
 
     return web_scraping_data
 
 def web_scraping_get_status(web_scraping_data):
-    return web_scraping_data["scraping_status"]
+    return web_scraping_data.get("scraping_status", "Idle")
 
 def web_scraping_set_status(web_scraping_data, status):
     web_scraping_data["scraping_status"] = status
 
     if status == "Idle":
         web_scraping_data["qtd_books"] = 0
+        web_scraping_data["qtd_scraped"] = 0
         web_scraping_data["books_dataframe"] = []
 
 def  web_scraping_get_database(web_scraping_data):
     return web_scraping_data["books_dataframe"]
 
-# Realiza a requisicao HTTP e retorna o objeto BeautifulSoup
-def url_get_soup(url):
-    response = requests.get(url)
-    response.encoding = response.apparent_encoding
-    
-    if response.status_code == 200:
-        html_content = response.text  # Pegamos o conteúdo HTML.
-    else:
-        print(f"Erro ao acessar a página. Código de status: {response.status_code}")
+# Realiza a requisicao HTTP e retorna o conteúdo HTML da página
+# Retorna None se a página não puder ser lida (mesmo depois das novas tentativas da sessão)
+def url_get_html(url):
+    try:
+        response = _SESSION.get(url, timeout=request_timeout)
+        response.raise_for_status()
+    except requests.RequestException as erro:
+        print(f"Erro ao acessar a página {url}: {erro}")
         return None
 
-    return BeautifulSoup(html_content, 'html.parser')
-
-# Gera o link a partir do url atual e a url relativa do link
-# O link relativo pode ter varios niveis de "../", portanto a funcao trata cada um como um retorno de pasta
-def gera_url_de_relativo (url_atual, url_relativo):
-    # Conta a quantidade de niveis "../" no link relativo e remove do link
-    qtd_level = url_relativo.count("../")
-    url_relativo_final = url_relativo.replace("../", "")
+    response.encoding = site_encoding
+    return response.text  # Pegamos o conteúdo HTML.
 
-    # Remove o final do url atual, deixando apenas o path e separa em niveis
-    url_atual_path = url_atual[:url_atual.rfind("/")+1]
-    url_parts = url_atual_path.strip("/").split("/")
-
-    # Remove os niveis do path de acordo com a quantidade de niveis "../" do link relativo
-    if qtd_level > 0 and len(url_parts) >= qtd_level:
-        url_parts = url_parts[:-qtd_level]
+# Realiza a requisicao HTTP e retorna o objeto BeautifulSoup
+def url_get_soup(url):
+    html_content = url_get_html(url)
+    if html_content is None:
+        return None
 
-    # Adiciona o link relativo ao path e retorna o link completo
-    return "/".join(url_parts + [url_relativo_final])
+    return BeautifulSoup(html_content, soup_parser)
 
 # Extrai todos os links da página, retornando um dicionario com o link completo e o nome do link
 # Se remove_nome_vazio for True, remove os links que não possuem nome
@@ -84,7 +154,7 @@ def extrai_urls (soup, url, remove_nome_vazio):
     base_urls = {}
     for link in links:
         url_relativo = link.get('href')
-        url_link = gera_url_de_relativo(url, url_relativo)
+        url_link = urljoin(url, url_relativo)
         nome_link = link.get_text(strip=True)
         if (not remove_nome_vazio) or len(nome_link) > 0:
             base_urls[url_link] = nome_link
@@ -100,36 +170,72 @@ def dic_extrai_valor (dicionario, valor):
 
 
 # Extrai os links de livros de uma página e retorna o dicionario com os links e o link da próxima página (se existir)
-def extrai_links_book (url, book_dic):
-    response = requests.get(url)
-
-    if response.status_code == 200:
-        html_content = response.text  # Pegamos o conteúdo HTML.
-    else:
-        print(f"Erro ao acessar a página. Código de status: {response.status_code}")
-
-    soup_books = BeautifulSoup(html_content, 'html.parser')
+# Se book_listing for informado, também guarda nele os dados de cada livro disponíveis na própria listagem
+# Se html_content for informado, usa o HTML já baixado em vez de baixar a página
+def extrai_links_book (url, book_dic, book_listing = None, html_content = None):
+    if html_content is None:
+        html_content = url_get_html(url)
+    if html_content is None:
+        return book_dic, None
+
+    soup_books = BeautifulSoup(html_content, soup_parser)
     soup_books_section = soup_books.find('section')
 
     books_url_pag_atual = extrai_urls (soup_books_section, url, True)
     link_next = dic_extrai_valor(books_url_pag_atual, 'next')
     link_previous = dic_extrai_valor(books_url_pag_atual, 'previous')
 
-    book_dic = book_dic | books_url_pag_atual
+    # Adiciona os links ao próprio dicionário, sem copiar todos os links já coletados a cada página
+    book_dic.update(books_url_pag_atual)
+
+    if book_listing is not None:
+        book_listing.update(soup_extract_listing_data(soup_books_section, url))
     return book_dic, link_next
 
+# Extrai o total de páginas da listagem a partir do texto do paginador ("Page 1 of 50")
+# Retorna None se a listagem não tiver paginador (página única)
+pager_pattern = re.compile(r'Page\s+\d+\s+of\s+(\d+)')
+
+def html_get_total_paginas (html_content):
+    match = pager_pattern.search(html_content)
+    return int(match.group(1)) if match else None
+
+# Extrai os dados de cada livro que já aparecem na página de listagem (dentro de 'article' na classe 'product_pod')
+# Título, preço, rating e imagem (miniatura); os demais campos só existem na página do livro
+def soup_extract_listing_data (soup_section, url):
+    listing_data = {}
+    for article in soup_section.find_all("article", class_="product_pod"):
+        link = article.find("h3").find("a")
+        img_tag = article.find("img")
+        star_rating = article.find("p", class_="star-rating").get("class")[1]
+        price_text = article.find("p", class_="price_color").get_text(strip=True)
+
+        listing_data[urljoin(url, link.get('href'))] = {
+            'title': link.get('title', link.get_text(strip=True)),
+            'image_url': urljoin(url, img_tag['src']) if img_tag else None,
+            'rating': rating_get_number(star_rating, 0),
+            'price': float(price_text.replace('£', '')),
+        }
+    return listing_data
+
 
 
 ## Parte 3: Extração dos dados de cada livro
 # - Os campos serão: title, price, stock, category, rating, description
 
+# Filtros de busca por tag e classe montados uma única vez e reaproveitados em todas as páginas de livro
+# (o find com tag e classe montaria um filtro novo a cada chamada; a busca por id continua no find)
+filtro_titulo = SoupStrainer("li", class_="active")
+filtro_categoria = SoupStrainer("ul", class_=class_category)
+filtro_rating = SoupStrainer("p", class_="star-rating")
+
 # Extrai o tiulo do livro (em 'li' na classe 'active')
 def soup_get_title (soup):
-    return soup.find("li", class_= "active").get_text(strip=True)
+    return soup.find(filtro_titulo).get_text(strip=True)
 
 # Extrai a categoria dentro da 'ul' na classe definida em class_category 
 def soup_get_category (soup):
-    category_class = soup.find("ul", class_= class_category)
+    category_class = soup.find(filtro_categoria)
 
     links = category_class.find_all('a')
     if len(links) >= category_link_number:
@@ -142,36 +248,43 @@ def soup_get_image_url (soup, url_atual):
     img_tag = soup.find("img")
     if img_tag and img_tag.has_attr('src'):
         image_path = img_tag['src']
-        return gera_url_de_relativo(url_atual, image_path)
+        return urljoin(url_atual, image_path)
     else:
         return None
     
 
-# Extrai os dados da tabela de informações do livro (dentro de 'table' na classe 'table table-striped')
-def soup_table_get_data (soup_table):
-    soup_data = {}
-    rows = soup_table.find_all('tr')
-    for row in rows:
-        soup_data[row.find('th').get_text(strip=True)] = row.find('td').get_text(strip=True)
-    return soup_data
+# Extrai os dados da tabela de informações do livro direto do HTML da página
+# A tabela tem formato fixo (<th>campo</th><td>valor</td>), então uma única regex lê todas as linhas
+# sem montar os objetos BeautifulSoup de cada linha
+table_row_pattern = re.compile(r'<th>([^<]+)</th>\s*<td>([^<]*)</td>')
+
+def html_table_get_data (html_content):
+    return {unescape(campo).strip(): unescape(valor).strip() for campo, valor in table_row_pattern.findall(html_content)}
 
 # Converte o texto do rating em número ( One, Two, Three, Four, Five)
-def convert_text_to_number(text):
-    text_to_number = {
-        "One": 1,
-        "Two": 2,
-        "Three": 3,
-        "Four": 4,
-        "Five": 5
-    }
-    return text_to_number.get(text, 0)
+# O dicionário é montado uma única vez e a busca é feita direto no método get
+rating_text_to_number = {
+    "One": 1,
+    "Two": 2,
+    "Three": 3,
+    "Four": 4,
+    "Five": 5
+}
+rating_get_number = rating_text_to_number.get
 
 
 # Extrai os dados do livro a partir da url da pagina do livro
 def soup_extract_book_data (book_url, indice):
+    html_book = url_get_html(book_url)
+    if html_book is None:
+        return None
+    return html_extract_book_data(html_book, book_url, indice)
+
+# Extrai os dados do livro a partir do HTML já baixado da pagina do livro
+def html_extract_book_data (html_book, book_url, indice):
     book_data = {}
 
-    soup_book = url_get_soup(book_url)
+    soup_book = BeautifulSoup(html_book, soup_parser)
 
     book_data['index'] = indice
 
@@ -180,12 +293,11 @@ def soup_extract_book_data (book_url, indice):
     book_data['category'] = soup_get_category(soup_book)
     book_data['image_url'] = soup_get_image_url(soup_book, book_url)
 
-    star_rating = soup_book.find("p",class_ = 'star-rating').get("class")[1]
-    book_data['rating'] = convert_text_to_number(star_rating)
+    star_rating = soup_book.find(filtro_rating).get("class")[1]
+    book_data['rating'] = rating_get_number(star_rating, 0)
 
     # Leitura da tabela de Product Information
-    table_prod_info = soup_book.find("table", class_ = 'table')
-    prod_info_dic = soup_table_get_data(table_prod_info)
+    prod_info_dic = html_table_get_data(html_book)
     book_data['upc'] = prod_info_dic['UPC']
     book_data['price'] = float(prod_info_dic['Price (excl. tax)'].replace('£',''))
     book_data['tax'] = float(prod_info_dic['Tax'].replace('£',''))
@@ -202,7 +314,38 @@ def soup_extract_book_data (book_url, indice):
     return book_data
 
 
-def web_scraping_get_books_url (url):
+# Baixa as páginas dos livros em paralelo (threads) e extrai os dados em paralelo (processos)
+# Retorna os dados de cada livro na ordem das urls; ao ser fechado, cancela o que ainda não começou
+# Os processos são iniciados com 'spawn': um script que chame esta função precisa do guard if __name__ == "__main__"
+def extrai_dados_livros (books_url):
+    fetch_pool = ThreadPoolExecutor(max_workers=max_workers)
+    # 'spawn' evita fazer fork de um processo com threads de download em execução
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    # Cada página é enviada para extração assim que termina de ser baixada
+    # Páginas que não puderam ser baixadas ou extraídas são ignoradas, sem interromper o scraping dos demais livros
+    def baixa_e_extrai (book_url, indice):
+        html_book = url_get_html(book_url)
+        if html_book is None:
+            return None
+        return parse_pool.submit(html_extract_book_data, html_book, book_url, indice)
+
+    try:
+        for parse_future in fetch_pool.map(baixa_e_extrai, books_url, range(len(books_url))):
+            if parse_future is None:
+                continue
+            try:
+                book_data = parse_future.result()
+            except Exception as erro:
+                print(f"Erro ao extrair os dados do livro: {erro}")
+                continue
+            yield book_data
+    finally:
+        fetch_pool.shutdown(cancel_futures=True)
+        parse_pool.shutdown(cancel_futures=True)
+
+
+def web_scraping_get_books_url (url, book_listing = None):
 
     print("Iniciando o scraping...")
     ## Parte 1: Leitura da página principal
@@ -211,6 +354,8 @@ def web_scraping_get_books_url (url):
 
     # Realiza a leitura da página principal
     soup_principal = url_get_soup(url)
+    if soup_principal is None:
+        return {}
 
     dic_urls_principal = extrai_urls(soup_principal, url = url, remove_nome_vazio = True)
     # localiza a url para a página dos livros
@@ -220,62 +365,56 @@ def web_scraping_get_books_url (url):
     # - Realiza a leitura da página de livros
     # - Localiza a área com os livros (dentro de section)
     # - Extrai o link de cada livro
-    # - Recursivo até não achar mais link de next
+    # - Demais páginas baixadas em paralelo (ou seguindo o link de next, se não houver paginador)
 
     # Inicia o dicionario de url de livros
     dic_url_books = {}
-    url_next = url_pagina_books
 
-    # Loop para extrair os links de todas as páginas até não existir mais página next
+    # A primeira página informa o total de páginas; as demais têm url previsível (page-2.html, page-3.html, ...)
+    # e são baixadas em paralelo. Os links são extraídos na ordem das páginas, mantendo a ordem dos livros
+    print("Extraindo links de página: ", url_pagina_books)
+    html_primeira_pagina = url_get_html(url_pagina_books)
+    if html_primeira_pagina is None:
+        return dic_url_books
+    dic_url_books, url_next = extrai_links_book(url_pagina_books, dic_url_books, book_listing, html_primeira_pagina)
+
+    total_paginas = html_get_total_paginas(html_primeira_pagina)
+    if total_paginas:
+        urls_paginas = [urljoin(url_pagina_books, f"page-{pagina}.html") for pagina in range(2, total_paginas + 1)]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url_pagina, html_pagina in zip(urls_paginas, executor.map(url_get_html, urls_paginas)):
+                print("Extraindo links de página: ", url_pagina)
+                if html_pagina is not None:
+                    dic_url_books, _ = extrai_links_book(url_pagina, dic_url_books, book_listing, html_pagina)
+        return dic_url_books
+
+    # Sem paginador: segue os links de next até não existir mais página next
     while (url_next != None):
         print("Extraindo links de página: ", url_next)
-        dic_url_books, url_next = extrai_links_book(url_next, dic_url_books)
+        dic_url_books, url_next = extrai_links_book(url_next, dic_url_books, book_listing)
     return dic_url_books
 
 
 
 def web_scraping (url):
 
-    print("Iniciando o scraping...")
-    ## Parte 1: Leitura da página principal
-    # - Realiza a leitura do link principal
-    # - Localiza o link da página que mostra todos os livros
-
-    # Realiza a leitura da página principal
-    soup_principal = url_get_soup(url)
-
-    dic_urls_principal = extrai_urls(soup_principal, url = url, remove_nome_vazio = True)
-    # localiza a url para a página dos livros
-    url_pagina_books = dic_extrai_valor(dic_urls_principal, nome_link_books)
-
-    ## Parte 2: Leitura da página de livros
-    # - Realiza a leitura da página de livros
-    # - Localiza a área com os livros (dentro de section)
-    # - Extrai o link de cada livro
-    # - Recursivo até não achar mais link de next
-
-    # Inicia o dicionario de url de livros
-    dic_url_books = {}
-    url_next = url_pagina_books
-
-    # Loop para extrair os links de todas as páginas até não existir mais página next
-    while (url_next != None):
-        dic_url_books, url_next = extrai_links_book(url_next, dic_url_books)
-
+    ## Partes 1 e 2: Leitura da página principal e das páginas de livros
+    # - Mesma extração de links usada pelo web_scraping_task (páginas da listagem baixadas em paralelo)
+    dic_url_books = web_scraping_get_books_url(url)
 
     # looping para extrair os dados de cada livro e montar o dataframe final
+    # As páginas são baixadas em paralelo e os resultados chegam na ordem das urls
     indice = 0
-    books_base = []
-    for book_url in dic_url_books:
-        if indice % 50 == 0:
-            print(indice)
-        book_data = soup_extract_book_data(book_url, indice)
-        book_df = pd.DataFrame([book_data])
-        if len(books_base) == 0:
-            books_base = book_df
-        else:
-            books_base = pd.concat([books_base, book_df], ignore_index=True)
-        indice += 1
+    books_rows = []
+    with closing(extrai_dados_livros(list(dic_url_books))) as books_data:
+        for book_data in books_data:
+            if indice % 50 == 0:
+                print(indice)
+            books_rows.append(book_data)
+            indice += 1
+
+    # Monta o dataframe uma única vez a partir da lista de livros
+    books_base = otimiza_tipos(pd.DataFrame(books_rows))
 
     return books_base
     # Salvando a base de dados em CSV
@@ -293,46 +432,88 @@ def web_scraping_status_message(web_scraping_data):
         str: A message indicating the current state of the scraping process.
     """
 
-    if web_scraping_get_status(web_scraping_data) == "Running":
-        if web_scraping_data["qtd_books"] == 0:
+    # Usa somente os contadores mantidos pelo scraping: não depende do tamanho do dataframe (que pode ser uma lista)
+    # e funciona mesmo se o dicionário ainda não tiver as chaves (ex.: consulta durante a inicialização)
+    status = web_scraping_get_status(web_scraping_data)
+    if status == "Running":
+        qtd_books = web_scraping_data.get("qtd_books", 0)
+        if not qtd_books:
             return "Scraping em andamento: Extraindo url dos livros. (Aguarde...)"
         else:
-            perc_scraped = (len(web_scraping_data["books_dataframe"]) / web_scraping_data["qtd_books"]) * 100
+            perc_scraped = (web_scraping_data.get("qtd_scraped", 0) / qtd_books) * 100
             return f"Scraping em andamento: {perc_scraped:.2f}%."
-    elif web_scraping_get_status(web_scraping_data) == "Done":
+    elif status == "Done":
         return "Scraping concluído."
     else:
         return "Scraping não iniciado."
     
-def web_scraping_task (url, web_scraping_data):        
+# Se fetch_detail for False, não baixa a página de cada livro: usa somente os dados da listagem
+# (título, preço, rating e imagem), deixando vazios os campos que só existem na página do livro
+def web_scraping_task (url, web_scraping_data, fetch_detail = True):        
     
     web_scraping_data["scraping_status"] = "Running"
     web_scraping_data["books_dataframe"] = []
+    web_scraping_data["qtd_scraped"] = 0
     
     print("Iniciando o scraping em background...")
-    books_url = web_scraping_get_books_url(url)
+    book_listing = None if fetch_detail else {}
+    books_url = web_scraping_get_books_url(url, book_listing)
     
     web_scraping_data["qtd_books"] = len(books_url)
 
     print("Total de livros para scraping: ", web_scraping_data["qtd_books"])
 
     indice = 0
+    # Os dados de cada livro são acumulados em uma lista e o dataframe é montado uma única vez no final
+    books_rows = []
+    
+    # Os livros são gravados em lotes num arquivo temporário, que só substitui a base ao final
+    os.makedirs(os.path.dirname(scraping_database_file), exist_ok=True)
+    temp_database_file = scraping_database_file + ".tmp"
     
-    for book_url in books_url:
+    if fetch_detail:
+        # As páginas são baixadas em paralelo e os resultados chegam na ordem das urls
+        books_data = extrai_dados_livros(list(books_url))
+    else:
+        books_data = ({'index': indice, **book_listing[book_url]} for indice, book_url in enumerate(books_url))
+
+    try:
+        with closing(books_data) as books_data, \
+                pq.ParquetWriter(temp_database_file, books_schema, compression='zstd') as parquet_writer:
+            for book_data in books_data:
+                if web_scraping_data["scraping_status"] == "Stopping":
+                    break
+                books_rows.append(book_data)
+                web_scraping_data["qtd_scraped"] = len(books_rows)
+                indice += 1
+                
+                if indice % parquet_batch_size == 0:
+                    parquet_writer.write_batch(pa.RecordBatch.from_pylist(books_rows[-parquet_batch_size:], schema=books_schema))
+            
+            # Grava o último lote incompleto
+            if indice % parquet_batch_size != 0:
+                parquet_writer.write_batch(pa.RecordBatch.from_pylist(books_rows[-(indice % parquet_batch_size):], schema=books_schema))
+
+        # Parada solicitada: descarta os lotes gravados e mantém a base anterior
         if web_scraping_data["scraping_status"] == "Stopping":
-            web_scraping_data["scraping_status"] = "Idle"
             return
-        book_data = soup_extract_book_data(book_url, indice)
-        book_df = pd.DataFrame([book_data])
-        if len(web_scraping_data["books_dataframe"]) == 0:
-            web_scraping_data["books_dataframe"] = book_df
-        else:
-            web_scraping_data["books_dataframe"] = pd.concat([web_scraping_data["books_dataframe"], book_df], ignore_index=True)
-        indice += 1
 
-    web_scraping_data["scraping_status"] = "Done"
+        # Nenhum livro extraído (site fora do ar, por exemplo): mantém a base anterior
+        if not books_rows:
+            print("Erro no scraping: nenhum livro foi extraído. A base anterior foi mantida.")
+            return
+
+        os.replace(temp_database_file, scraping_database_file)
+
+        web_scraping_data["books_dataframe"] = otimiza_tipos(pd.DataFrame(books_rows, columns=books_schema.names))
+        web_scraping_data["scraping_status"] = "Done"
+    finally:
+        # Parada, falha ou erro inesperado: remove o arquivo temporário e volta para Idle
+        if os.path.exists(temp_database_file):
+            os.remove(temp_database_file)
+        if web_scraping_data["scraping_status"] != "Done":
+            web_scraping_data["scraping_status"] = "Idle"
 
-    web_scraping_data["books_dataframe"].to_csv(scraping_database_file, index=False)
     return web_scraping_data["books_dataframe"]
 
 def web_scraping_delete_database():
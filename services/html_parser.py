@@ -6,7 +6,8 @@ das páginas HTML usando BeautifulSoup. Separado para manter as responsabilidade
 de parsing independentes da lógica de controle do scraper.
 """
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.html
 from urllib.parse import urljoin
 
 
@@ -16,6 +17,22 @@ class HTMLParser:
     das páginas do Books to Scrape usando BeautifulSoup.
     """
     
+    # Filtros de busca montados uma única vez e reaproveitados em todas as páginas
+    TITLE_FILTER = SoupStrainer("li", class_="active")
+    IMAGE_FILTER = SoupStrainer("div", class_="item active")
+    RATING_FILTER = SoupStrainer("p", class_="star-rating")
+    TABLE_FILTER = SoupStrainer("table", class_="table")
+    DESCRIPTION_FILTER = SoupStrainer("div", id="product_description")
+    
+    # Conversão da classificação em texto para número
+    RATING_TO_NUMBER = {
+        "One": 1,
+        "Two": 2,
+        "Three": 3,
+        "Four": 4,
+        "Five": 5
+    }
+    
     def __init__(self, class_category="breadcrumb", category_link_number=3):
         """
         Inicializa o parser com configurações para extração de categorias.
@@ -26,6 +43,7 @@ class HTMLParser:
         """
         self.class_category = class_category
         self.category_link_number = category_link_number
+        self.category_filter = SoupStrainer("ul", class_=class_category)
 
     def extract_title(self, soup):
         """
@@ -37,7 +55,7 @@ class HTMLParser:
         Returns:
             str: Título do livro
         """
-        title_li = soup.find("li", class_="active")
+        title_li = soup.find(self.TITLE_FILTER)
         if title_li:
             return title_li.get_text(strip=True)
         return ""
@@ -52,7 +70,7 @@ class HTMLParser:
         Returns:
             str: Categoria do livro
         """
-        category_class = soup.find("ul", class_=self.class_category)
+        category_class = soup.find(self.category_filter)
 
         if category_class is None:
             return ""
@@ -74,7 +92,7 @@ class HTMLParser:
         Returns:
             str: URL da imagem do livro
         """
-        img_tag = soup.find("div", class_="item active")
+        img_tag = soup.find(self.IMAGE_FILTER)
         if img_tag:
             img_element = img_tag.find("img")
             if img_element:
@@ -93,12 +111,11 @@ class HTMLParser:
         Returns:
             int: Rating do livro (1-5), 0 se não encontrado
         """
-        star_rating_element = soup.find("p", class_='star-rating')
+        star_rating_element = soup.find(self.RATING_FILTER)
         if star_rating_element:
             star_classes = star_rating_element.get("class")
             if len(star_classes) >= 2:
-                star_text = star_classes[1]
-                return self._convert_text_to_number(star_text)
+                return self.RATING_TO_NUMBER.get(star_classes[1], 0)
         return 0
 
     def extract_table_data(self, soup_table):
@@ -130,7 +147,7 @@ class HTMLParser:
         Returns:
             dict: Dicionário com informações do produto (UPC, preço, estoque, etc.)
         """
-        table_prod_info = soup.find("table", class_='table')
+        table_prod_info = soup.find(self.TABLE_FILTER)
         if table_prod_info:
             return self.extract_table_data(table_prod_info)
         return {}
@@ -145,7 +162,7 @@ class HTMLParser:
         Returns:
             str: Descrição do livro
         """
-        description_div = soup.find("div", id="product_description")
+        description_div = soup.find(self.DESCRIPTION_FILTER)
         if description_div:
             next_p = description_div.find_next('p')
             if next_p:
@@ -178,6 +195,40 @@ class HTMLParser:
                     
         return page_urls
 
+    def extract_section_links_from_html(self, html_content, base_url, remove_empty_names=True):
+        """
+        Extrai os links de dentro da 'section' de uma página (links dos livros e da
+        paginação nas páginas de listagem) e retorna um dicionário.
+        
+        Lê o HTML direto com o lxml, sem montar a árvore do BeautifulSoup, já que
+        das páginas de listagem só são necessários os links.
+        
+        Args:
+            html_content (str): Conteúdo HTML da página
+            base_url (str): URL base para resolver URLs relativas
+            remove_empty_names (bool): Se True, remove entradas com nomes vazios
+            
+        Returns:
+            dict: Dicionário com URLs como chaves e nomes como valores,
+                  ou None se a página não tiver 'section'
+        """
+        section = lxml.html.fromstring(html_content).find('.//section')
+        if section is None:
+            return None
+        
+        page_urls = {}
+        
+        for link in section.iter('a'):
+            url_relativo = link.get('href')
+            if url_relativo:
+                url_link = urljoin(base_url, url_relativo)
+                nome_link = link.text_content().strip()
+                
+                if (not remove_empty_names) or len(nome_link) > 0:
+                    page_urls[url_link] = nome_link
+                    
+        return page_urls
+
     def extract_book_data_complete(self, soup, book_url, index):
         """
         Extrai todos os dados de um livro de forma completa.
@@ -223,25 +274,6 @@ class HTMLParser:
 
         return book_data
 
-    def _convert_text_to_number(self, text):
-        """
-        Converte uma classificação em texto para um número.
-        
-        Args:
-            text (str): Texto da classificação (One, Two, etc.)
-            
-        Returns:
-            int: Número correspondente (1-5), 0 se não encontrado
-        """
-        text_to_number = {
-            "One": 1,
-            "Two": 2,
-            "Three": 3,
-            "Four": 4,
-            "Five": 5
-        }
-        return text_to_number.get(text, 0)
-
     def _extract_price_value(self, price_text):
         """
         Extrai valor numérico de um texto de preço.
@@ -6,10 +6,16 @@ incluindo operações de rede, manipulação de dados e funções auxiliares.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
 import os
+import re
+import numpy as np
 import pandas as pd
-from typing import Dict, Optional, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from typing import Dict, List, Optional, Tuple
 
 
 class ScraperUtils:
@@ -18,26 +24,65 @@ class ScraperUtils:
     manipulação de dados e helpers gerais.
     """
 
+    TOKEN_PATTERN = re.compile(r"\w+")
+    USER_AGENT = "Mozilla/5.0 (compatible; BooksScraper/1.0)"
+    # Parser do BeautifulSoup: o lxml (em C) monta a árvore bem mais rápido que o 'html.parser'
+    SOUP_PARSER = "lxml"
+    # Encoding das páginas do site (declarado no <meta charset>), usado quando o servidor não informa o charset
+    DEFAULT_ENCODING = "utf-8"
+
     @staticmethod
-    def extract_soup_from_url(url: str, timeout: int = 10) -> Optional[BeautifulSoup]:
+    def create_session(pool_maxsize: int = 32) -> requests.Session:
         """
-        Faz uma requisição HTTP para a URL fornecida e retorna um objeto BeautifulSoup.
+        Cria uma sessão HTTP com pool de conexões e novas tentativas automáticas.
+        
+        A sessão mantém as conexões abertas (keep-alive) entre as requisições, evitando
+        um novo handshake TCP/TLS a cada página.
+        
+        Args:
+            pool_maxsize (int): Quantidade máxima de conexões mantidas por host
+            
+        Returns:
+            requests.Session: Sessão configurada
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=3, backoff_factor=0.3)
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({"User-Agent": ScraperUtils.USER_AGENT})
+        return session
+
+    @staticmethod
+    def fetch_html(
+        url: str,
+        timeout: int = 10,
+        session: Optional[requests.Session] = None
+    ) -> Optional[str]:
+        """
+        Faz uma requisição HTTP para a URL fornecida e retorna o conteúdo HTML.
         
         Args:
             url (str): A URL da página web a ser requisitada
             timeout (int): Timeout para a requisição em segundos
+            session (requests.Session, optional): Sessão HTTP a ser usada; se não
+                informada, usa a sessão compartilhada do módulo
             
         Returns:
-            BeautifulSoup: Objeto BeautifulSoup contendo o conteúdo HTML da página,
-                          ou None se a requisição falhar
+            str: Conteúdo HTML da página, ou None se a requisição falhar
         """
         try:
-            response = requests.get(url, timeout=timeout)
-            response.encoding = response.apparent_encoding
+            response = (session or _SESSION).get(url, timeout=timeout)
+            # Usa o charset do cabeçalho Content-Type; sem ele, o encoding do site, em vez
+            # de detectar o encoding analisando o conteúdo inteiro da resposta
+            if 'charset' not in response.headers.get('Content-Type', ''):
+                response.encoding = ScraperUtils.DEFAULT_ENCODING
             
             if response.status_code == 200:
-                html_content = response.text
-                return BeautifulSoup(html_content, 'html.parser')
+                return response.text
             else:
                 print(f"Erro HTTP {response.status_code} ao acessar {url}")
                 return None
@@ -46,6 +91,31 @@ class ScraperUtils:
             print(f"Erro ao acessar a URL {url}: {e}")
             return None
 
+    @staticmethod
+    def extract_soup_from_url(
+        url: str,
+        timeout: int = 10,
+        session: Optional[requests.Session] = None
+    ) -> Optional[BeautifulSoup]:
+        """
+        Faz uma requisição HTTP para a URL fornecida e retorna um objeto BeautifulSoup.
+        
+        Args:
+            url (str): A URL da página web a ser requisitada
+            timeout (int): Timeout para a requisição em segundos
+            session (requests.Session, optional): Sessão HTTP a ser usada; se não
+                informada, usa a sessão compartilhada do módulo
+            
+        Returns:
+            BeautifulSoup: Objeto BeautifulSoup contendo o conteúdo HTML da página,
+                          ou None se a requisição falhar
+        """
+        html_content = ScraperUtils.fetch_html(url, timeout, session)
+        if html_content is None:
+            return None
+        
+        return BeautifulSoup(html_content, ScraperUtils.SOUP_PARSER)
+
     @staticmethod
     def extract_and_remove_dict_value(dictionary: Dict, value) -> Optional[str]:
         """
@@ -58,17 +128,24 @@ class ScraperUtils:
         Returns:
             str: A chave correspondente ao valor, ou None se não encontrado
         """
-        for key in list(dictionary.keys()):
-            if dictionary[key] == value:
-                del dictionary[key]
-                return key
-        return None
+        # Percorre os pares sem copiar as chaves; a remoção acontece depois de sair do loop
+        for key, item_value in dictionary.items():
+            if item_value == value:
+                break
+        else:
+            return None
+        
+        del dictionary[key]
+        return key
 
     @staticmethod
     def save_dataframe_to_csv(dataframe: pd.DataFrame, file_path: str) -> bool:
         """
         Salva um DataFrame em arquivo CSV, criando diretórios se necessário.
         
+        O arquivo é gravado em um temporário e depois renomeado, então leitores
+        concorrentes nunca veem um arquivo pela metade.
+        
         Args:
             dataframe (pd.DataFrame): DataFrame a ser salvo
             file_path (str): Caminho do arquivo CSV
@@ -81,7 +158,9 @@ class ScraperUtils:
             os.makedirs(os.path.dirname(file_path), exist_ok=True)
             
             # Salva o DataFrame
-            dataframe.to_csv(file_path, index=False)
+            temp_file = f"{file_path}.{os.getpid()}.tmp"
+            dataframe.to_csv(temp_file, index=False)
+            os.replace(temp_file, file_path)
             return True
             
         except Exception as e:
@@ -109,6 +188,58 @@ class ScraperUtils:
             print(f"Erro ao carregar arquivo CSV {file_path}: {e}")
             return None
 
+    @staticmethod
+    def save_dataframe_to_parquet(dataframe: pd.DataFrame, file_path: str) -> bool:
+        """
+        Salva um DataFrame em arquivo Parquet, com as colunas de baixa cardinalidade
+        codificadas em dicionário.
+        
+        O arquivo é gravado em um temporário e depois renomeado, então leitores
+        concorrentes nunca veem um arquivo pela metade.
+        
+        Args:
+            dataframe (pd.DataFrame): DataFrame a ser salvo
+            file_path (str): Caminho do arquivo Parquet
+            
+        Returns:
+            bool: True se salvou com sucesso, False caso contrário
+        """
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            
+            table = pa.Table.from_pandas(dataframe, preserve_index=False)
+            dictionary_columns = [column for column in ('category', 'rating') if column in table.column_names]
+            
+            temp_file = f"{file_path}.{os.getpid()}.tmp"
+            pq.write_table(table, temp_file, compression='zstd', use_dictionary=dictionary_columns)
+            os.replace(temp_file, file_path)
+            return True
+            
+        except Exception as e:
+            print(f"Erro ao salvar arquivo Parquet {file_path}: {e}")
+            return False
+
+    @staticmethod
+    def load_dataframe_from_parquet(file_path: str) -> Optional[pd.DataFrame]:
+        """
+        Carrega um DataFrame de um arquivo Parquet (via memory map).
+        
+        Args:
+            file_path (str): Caminho do arquivo Parquet
+            
+        Returns:
+            pd.DataFrame: DataFrame carregado, ou None se arquivo não existir
+        """
+        try:
+            if os.path.exists(file_path):
+                return pq.read_table(file_path, memory_map=True).to_pandas()
+            else:
+                return None
+                
+        except Exception as e:
+            print(f"Erro ao carregar arquivo Parquet {file_path}: {e}")
+            return None
+
     @staticmethod
     def delete_file_if_exists(file_path: str) -> bool:
         """
@@ -130,7 +261,12 @@ class ScraperUtils:
             return False
 
     @staticmethod
-    def extract_books_from_page(url: str, book_dict: Dict, html_parser) -> Tuple[Dict, Optional[str]]:
+    def extract_books_from_page(
+        url: str,
+        book_dict: Dict,
+        html_parser,
+        session: Optional[requests.Session] = None
+    ) -> Tuple[Dict, Optional[str]]:
         """
         Extrai os links dos livros de uma página e retorna o dicionário atualizado
         e o link da próxima página.
@@ -139,23 +275,22 @@ class ScraperUtils:
             url (str): URL da página a ser analisada
             book_dict (dict): Dicionário atual de links de livros
             html_parser: Instância do HTMLParser para extrair links
+            session (requests.Session, optional): Sessão HTTP a ser usada
             
         Returns:
             tuple: (Dicionário atualizado de links de livros, URL da próxima página ou None)
         """
         try:
-            soup_books = ScraperUtils.extract_soup_from_url(url)
-            if soup_books is None:
-                return book_dict, None
-
-            soup_books_section = soup_books.find('section')
-            if soup_books_section is None:
+            html_books = ScraperUtils.fetch_html(url, session=session)
+            if html_books is None:
                 return book_dict, None
 
-            # Extrai URLs da página atual
-            books_url_current_page = html_parser.extract_links_from_page(
-                soup_books_section, url, remove_empty_names=True
+            # Extrai URLs da página atual (links dentro de 'section', lidos direto com o lxml)
+            books_url_current_page = html_parser.extract_section_links_from_html(
+                html_books, url, remove_empty_names=True
             )
+            if books_url_current_page is None:
+                return book_dict, None
 
             # Remove links de navegação
             link_next = ScraperUtils.extract_and_remove_dict_value(books_url_current_page, 'next')
@@ -171,7 +306,12 @@ class ScraperUtils:
             return book_dict, None
 
     @staticmethod
-    def extract_all_books_urls(base_url: str, html_parser, scraping_state=None) -> Dict[str, str]:
+    def extract_all_books_urls(
+        base_url: str,
+        html_parser,
+        scraping_state=None,
+        session: Optional[requests.Session] = None
+    ) -> Dict[str, str]:
         """
         Obtém as URLs de todos os livros navegando por todas as páginas.
         
@@ -179,13 +319,14 @@ class ScraperUtils:
             base_url (str): URL base do site
             html_parser: Instância do HTMLParser
             scraping_state: Estado do scraping para atualização em tempo real (opcional)
+            session (requests.Session, optional): Sessão HTTP a ser usada
             
         Returns:
             dict: Dicionário com URLs dos livros como chaves e títulos como valores
         """
         try:
             # Realiza a leitura da página principal
-            soup_principal = ScraperUtils.extract_soup_from_url(base_url)
+            soup_principal = ScraperUtils.extract_soup_from_url(base_url, session=session)
             if soup_principal is None:
                 return {}
 
@@ -209,11 +350,15 @@ class ScraperUtils:
             # Loop para extrair links de todas as páginas
             while current_url is not None and page_count < max_pages:
              
+                # Interrompe a extração se foi solicitada a parada do scraping
+                if scraping_state is not None and scraping_state.status == "Stopping":
+                    break
+                
                 page_count += 1
                 
                 # Extrai livros da página atual
                 books_url_dict, current_url = ScraperUtils.extract_books_from_page(
-                    current_url, books_url_dict, html_parser
+                    current_url, books_url_dict, html_parser, session
                 )
                 
                 # Atualiza o estado em tempo real se fornecido
@@ -241,32 +386,146 @@ class ScraperUtils:
             return {}
 
     @staticmethod
-    def search_books_in_dataframe(dataframe: pd.DataFrame, title: str = None, category: str = None) -> list:
+    def convert_columns_to_category(dataframe: pd.DataFrame, columns: Tuple[str, ...] = ('category',)) -> pd.DataFrame:
         """
-        Pesquisa livros no DataFrame com base no título e/ou categoria.
+        Converte colunas de texto com poucos valores distintos para o tipo 'category'.
+        
+        Cada valor distinto é guardado uma única vez e as linhas passam a guardar
+        apenas um código inteiro.
         
         Args:
             dataframe (pd.DataFrame): DataFrame com dados dos livros
-            title (str, optional): Título do livro para pesquisa
-            category (str, optional): Categoria do livro para pesquisa
+            columns (tuple): Colunas a converter (as ausentes são ignoradas)
             
         Returns:
-            list: Lista de dicionários contendo os dados dos livros encontrados
+            pd.DataFrame: DataFrame com as colunas convertidas
+        """
+        category_columns = {column: 'category' for column in columns if column in dataframe.columns}
+        if not category_columns:
+            return dataframe
+        
+        return dataframe.astype(category_columns)
+
+    @staticmethod
+    def dataframe_to_records(dataframe: pd.DataFrame) -> list:
+        """
+        Converte o DataFrame em uma lista de dicionários prontos para serialização JSON.
+        
+        Valores ausentes (NaN) são convertidos para None, já que NaN não é um valor
+        JSON válido.
+        
+        Args:
+            dataframe (pd.DataFrame): DataFrame com dados dos livros
+            
+        Returns:
+            list: Lista de dicionários, um por livro, na ordem do DataFrame
         """
         try:
-            results = dataframe.copy()
+            return dataframe.astype(object).where(dataframe.notna(), None).to_dict(orient='records')
+            
+        except Exception as e:
+            print(f"Erro ao converter livros em registros: {e}")
+            return []
 
-            if title:
-                results = results[results['title'].str.contains(title, case=False, na=False)]
+    @staticmethod
+    def build_title_index(titles_lower: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Monta um índice invertido dos títulos (token -> posições dos livros).
+        
+        Args:
+            titles_lower (list): Títulos dos livros em minúsculas, na ordem do DataFrame
+            
+        Returns:
+            dict: Dicionário com cada token como chave e um array ordenado com as
+                  posições dos livros que contêm o token
+        """
+        postings = {}
+        for position, title in enumerate(titles_lower):
+            for token in set(ScraperUtils.TOKEN_PATTERN.findall(title)):
+                postings.setdefault(token, []).append(position)
+                
+        return {token: np.array(positions, dtype=np.int64) for token, positions in postings.items()}
 
-            if category:
-                results = results[results['category'].str.contains(category, case=False, na=False)]
+    @staticmethod
+    def search_title_index(
+        title_index: Dict[str, np.ndarray],
+        titles_lower: List[str],
+        title: str,
+        candidates: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Busca parcial (case insensitive) por título usando os títulos em minúsculas
+        pré-calculados e, quando compensa, o índice invertido.
+        
+        Cada token da busca está contido em algum token do título procurado, então
+        o índice reduz os candidatos e a busca parcial só é confirmada sobre eles.
+        Percorrer o vocabulário do índice custa proporcional ao seu tamanho, por isso
+        ele só é usado quando tem menos entradas que os candidatos a verificar.
+        
+        Args:
+            title_index (dict): Índice invertido gerado por build_title_index
+            titles_lower (list): Títulos dos livros em minúsculas
+            title (str): Texto a ser buscado nos títulos
+            candidates (np.ndarray, optional): Posições ordenadas às quais limitar a busca
+            
+        Returns:
+            np.ndarray: Posições dos livros cujo título contém o texto buscado
+        """
+        query = title.lower()
+        if candidates is None:
+            candidates = np.arange(len(titles_lower), dtype=np.int64)
+        
+        if len(title_index) < len(candidates):
+            for token in set(ScraperUtils.TOKEN_PATTERN.findall(query)):
+                matches = [positions for key, positions in title_index.items() if token in key]
+                if not matches:
+                    return np.empty(0, dtype=np.int64)
+                
+                token_positions = np.unique(np.concatenate(matches))
+                candidates = np.intersect1d(candidates, token_positions, assume_unique=True)
+                if len(candidates) == 0:
+                    return candidates
+            
+        return np.array([p for p in candidates.tolist() if query in titles_lower[p]], dtype=np.int64)
+
+    @staticmethod
+    def build_category_index(dataframe: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Agrupa as posições dos livros por categoria.
+        
+        Args:
+            dataframe (pd.DataFrame): DataFrame com dados dos livros
+            
+        Returns:
+            dict: Dicionário com cada categoria como chave e um array ordenado com as
+                  posições dos livros da categoria
+        """
+        if 'category' not in dataframe.columns:
+            return {}
+        
+        return {
+            str(category): positions.astype(np.int64)
+            for category, positions in dataframe.groupby('category', sort=False, observed=True).indices.items()
+        }
 
-            return results.to_dict(orient='records')
+    @staticmethod
+    def search_category_index(category_index: Dict[str, np.ndarray], category: str) -> np.ndarray:
+        """
+        Busca parcial (case insensitive) por categoria usando os grupos pré-calculados.
+        
+        Args:
+            category_index (dict): Grupos gerados por build_category_index
+            category (str): Texto a ser buscado nas categorias
             
-        except Exception as e:
-            print(f"Erro ao pesquisar livros: {e}")
-            return []
+        Returns:
+            np.ndarray: Posições ordenadas dos livros das categorias encontradas
+        """
+        query = category.lower()
+        matches = [positions for name, positions in category_index.items() if query in name.lower()]
+        if not matches:
+            return np.empty(0, dtype=np.int64)
+        
+        return np.unique(np.concatenate(matches))
 
     @staticmethod
     def extract_books_titles_from_dataframe(dataframe: pd.DataFrame) -> list:
@@ -289,6 +548,27 @@ class ScraperUtils:
             print(f"Erro ao extrair títulos: {e}")
             return []
 
+    @staticmethod
+    def extract_sorted_categories_from_dataframe(dataframe: pd.DataFrame) -> list:
+        """
+        Extrai as categorias únicas dos livros em ordem alfabética.
+        
+        Args:
+            dataframe (pd.DataFrame): DataFrame com dados dos livros
+            
+        Returns:
+            list: Lista ordenada com as categorias únicas
+        """
+        try:
+            if 'category' in dataframe.columns:
+                return sorted(dataframe['category'].dropna().astype(str).unique().tolist())
+            else:
+                return []
+                
+        except Exception as e:
+            print(f"Erro ao extrair categorias: {e}")
+            return []
+
     @staticmethod
     def calculate_scraping_progress(current_count: int, total_count: int) -> float:
         """
@@ -304,4 +584,8 @@ class ScraperUtils:
         if total_count <= 0:
             return 0.0
         
-        return min((current_count / total_count) * 100, 100.0)
\ No newline at end of file
+        return min((current_count / total_count) * 100, 100.0)
+
+
+# Sessão HTTP compartilhada, usada quando nenhuma sessão é informada
+_SESSION = ScraperUtils.create_session()
@@ -0,0 +1,174 @@
+"""
+Shared State Module
+
+Este módulo contém a classe SharedScrapingState, que compartilha o estado do scraping
+entre processos (workers do uvicorn) através de arquivos gravados ao lado da base de
+dados. Assim apenas um processo executa o scraping por vez e os demais conseguem
+acompanhar o seu progresso.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import orjson
+
+
+class SharedScrapingState:
+    """
+    Estado do scraping compartilhado entre processos via arquivos.
+
+    - O arquivo de lock existe enquanto algum processo executa o scraping e guarda o
+      status publicado por ele (a data de modificação funciona como heartbeat)
+    - O arquivo de parada sinaliza ao processo dono do lock que o scraping deve parar
+    """
+
+    def __init__(self, database_file: str, stale_after_seconds: float = 30):
+        """
+        Inicializa os caminhos dos arquivos compartilhados.
+
+        Args:
+            database_file (str): Caminho do arquivo da base de dados
+            stale_after_seconds (float): Tempo sem heartbeat para considerar o lock abandonado
+        """
+        self.lock_file = f"{database_file}.lock"
+        self.stop_file = f"{database_file}.stop"
+        self.stale_after_seconds = stale_after_seconds
+        self._owner = False
+        self._write_lock = threading.Lock()
+
+    @property
+    def is_owner(self) -> bool:
+        """Indica se este processo detém o lock do scraping."""
+        return self._owner
+
+    def acquire(self, snapshot: dict) -> bool:
+        """
+        Tenta obter o lock do scraping de forma atômica.
+
+        Args:
+            snapshot (dict): Estado inicial a ser publicado no lock
+
+        Returns:
+            bool: True se o lock foi obtido, False se outro processo já está fazendo scraping
+        """
+        try:
+            os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+
+            # Lock sem heartbeat recente pertence a um processo que morreu
+            if self._is_stale():
+                self._take_over_stale_lock()
+
+            fd = os.open(self.lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            with os.fdopen(fd, 'wb') as lock:
+                lock.write(orjson.dumps(snapshot))
+
+        except FileExistsError:
+            return False
+        except Exception as e:
+            print(f"Erro ao obter o lock do scraping {self.lock_file}: {e}")
+            return False
+
+        self._remove(self.stop_file)
+        self._owner = True
+        return True
+
+    def publish(self, snapshot: dict) -> None:
+        """
+        Publica o estado atual no lock (somente o processo dono do lock).
+
+        Args:
+            snapshot (dict): Estado do scraping a ser publicado
+        """
+        with self._write_lock:
+            if not self._owner:
+                return
+            try:
+                temp_file = f"{self.lock_file}.{os.getpid()}.tmp"
+                with open(temp_file, 'wb') as temp:
+                    temp.write(orjson.dumps(snapshot))
+                os.replace(temp_file, self.lock_file)
+
+            except Exception as e:
+                print(f"Erro ao publicar o estado do scraping: {e}")
+
+    def release(self) -> None:
+        """Libera o lock e remove qualquer pedido de parada pendente."""
+        with self._write_lock:
+            if not self._owner:
+                return
+            self._owner = False
+            self._remove(self.lock_file)
+            self._remove(self.stop_file)
+
+    def read(self) -> Optional[dict]:
+        """
+        Lê o estado publicado pelo processo que está fazendo scraping.
+
+        Returns:
+            dict: Estado publicado, ou None se nenhum scraping estiver ativo
+        """
+        try:
+            if self._is_stale():
+                return None
+            with open(self.lock_file, 'rb') as lock:
+                return orjson.loads(lock.read())
+
+        except (OSError, orjson.JSONDecodeError):
+            return None
+
+    def request_stop(self) -> None:
+        """Sinaliza ao processo dono do lock que o scraping deve parar."""
+        try:
+            with open(self.stop_file, 'wb'):
+                pass
+        except Exception as e:
+            print(f"Erro ao solicitar a parada do scraping: {e}")
+
+    def stop_requested(self) -> bool:
+        """Indica se outro processo solicitou a parada do scraping."""
+        return os.path.exists(self.stop_file)
+
+    def _is_stale(self, lock_file: Optional[str] = None) -> bool:
+        """Indica se o lock existe mas está sem heartbeat recente."""
+        try:
+            return time.time() - os.path.getmtime(lock_file or self.lock_file) > self.stale_after_seconds
+        except OSError:
+            return False
+
+    def _take_over_stale_lock(self) -> None:
+        """
+        Remove o lock abandonado por um processo que morreu.
+
+        Só um processo por vez faz a remoção (arquivo de takeover criado com O_EXCL) e o
+        lock é verificado de novo antes de ser removido: um lock recém-criado por outro
+        processo nunca é apagado.
+        """
+        takeover_file = f"{self.lock_file}.takeover"
+
+        # Takeover interrompido por um processo que morreu durante a remoção
+        if self._is_stale(takeover_file):
+            self._remove(takeover_file)
+
+        try:
+            os.close(os.open(takeover_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
+            # Outro processo já está removendo o lock abandonado
+            return
+
+        try:
+            if self._is_stale():
+                self._remove(self.lock_file)
+        finally:
+            self._remove(takeover_file)
+
+    @staticmethod
+    def _remove(file_path: str) -> None:
+        """Remove um arquivo ignorando se ele não existir."""
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Erro ao remover arquivo {file_path}: {e}")
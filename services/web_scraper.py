@@ -5,20 +5,45 @@ Este módulo contém a classe principal WebScraper que orquestra o processo de s
 utilizando os módulos especializados HTMLParser e ScraperUtils.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+import hashlib
+import os
+import threading
+import time
+import numpy as np
+import orjson
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from .html_parser import HTMLParser
 from .scraper_utils import ScraperUtils
+from .shared_state import SharedScrapingState
 
 
-@dataclass
+@dataclass(slots=True)
 class ScrapingState:
     """Estado do processo de scraping."""
     books_dataframe: pd.DataFrame = field(default_factory=pd.DataFrame)
     qtd_books_urls: int = 0
+    qtd_books_scraped: int = 0
     status: str = "Idle"
+    # Sinalizado quando não há task de scraping em execução
+    stopped_event: threading.Event = field(default_factory=threading.Event)
+    # Visões pré-calculadas da base, montadas quando o scraping termina
+    categories_sorted: List[str] = field(default_factory=list)
+    categories_json: bytes = b""
+    titles: List[str] = field(default_factory=list)
+    titles_json: bytes = b""
+    titles_lower: List[str] = field(default_factory=list)
+    title_index: Dict[str, np.ndarray] = field(default_factory=dict)
+    category_to_indices: Dict[str, np.ndarray] = field(default_factory=dict)
+    books_records: List[dict] = field(default_factory=list)
+    books_json: List[bytes] = field(default_factory=list)
+    dataset_etag: str = ""
+
+    def __post_init__(self):
+        self.stopped_event.set()
 
 
 class WebScraper:
@@ -29,30 +54,225 @@ class WebScraper:
     
     BASE_URL = 'https://books.toscrape.com/'
     SCRAPING_DATABASE_FILE = './data/scraping_books_database.csv'
+    RUNNING_STATUSES = ("Extracting_urls", "Scraping_books")
+    STOP_TIMEOUT_SECONDS = 30
+    SHARED_STATE_INTERVAL_SECONDS = 1
+    # Quantidade de páginas de livros baixadas e extraídas em paralelo
+    BOOK_FETCH_WORKERS = 16
     
     def __init__(self):
-        """Inicializa o scraper com parser HTML e estado."""
+        """
+        Inicializa o scraper com parser HTML, estado e estado compartilhado entre workers.
+        
+        A base existente não é lida aqui: a aplicação chama load_existing_data na
+        inicialização do servidor, mantendo a importação do módulo sem efeitos colaterais.
+        """
         self.state = ScrapingState()
         self.html_parser = HTMLParser()
         self.utils = ScraperUtils()
-        self.load_existing_data()
+        # Sessão HTTP reaproveitada por todas as requisições do scraping (keep-alive)
+        self.session = self.utils.create_session()
+        self.shared = SharedScrapingState(self.SCRAPING_DATABASE_FILE)
+        # Cópia em Parquet da base, lida nas inicializações seguintes no lugar do CSV
+        self.database_parquet_file = os.path.splitext(self.SCRAPING_DATABASE_FILE)[0] + '.parquet'
+        self._database_signature = None
+        self._last_shared_sync = 0.0
+        self._shared_sync_lock = threading.Lock()
+        # Protege a transição "Idle -> Extracting_urls" contra inícios simultâneos
+        self._start_lock = threading.Lock()
+        self._start_claimed = False
+        # Protege as trocas de status da task contra uma parada solicitada ao mesmo tempo
+        self._status_lock = threading.Lock()
     
     def load_existing_data(self) -> ScrapingState:
         """
-        Carrega dados existentes do arquivo CSV se disponível.
+        Carrega dados existentes da base se disponível.
+        
+        A cópia em Parquet é usada quando está atualizada em relação ao CSV; caso
+        contrário o CSV é lido e a cópia em Parquet é gravada para as próximas
+        inicializações.
         
         Returns:
             ScrapingState: Estado atual do scraping
         """
-        existing_data = self.utils.load_dataframe_from_csv(self.SCRAPING_DATABASE_FILE)
+        self._database_signature = self._get_database_signature()
+        existing_data = None
+        
+        if self._is_parquet_up_to_date():
+            existing_data = self.utils.load_dataframe_from_parquet(self.database_parquet_file)
+            
+        if existing_data is None:
+            existing_data = self.utils.load_dataframe_from_csv(self.SCRAPING_DATABASE_FILE)
+            if existing_data is not None and len(existing_data) > 0:
+                self.utils.save_dataframe_to_parquet(existing_data, self.database_parquet_file)
         
         if existing_data is not None and len(existing_data) > 0:
-            self.state.books_dataframe = existing_data
+            self.state.books_dataframe = self.utils.convert_columns_to_category(existing_data)
+            self.build_read_cache()
             self.state.status = "Done"
             self.state.qtd_books_urls = len(existing_data)
             
         return self.state
 
+    def _is_parquet_up_to_date(self) -> bool:
+        """Indica se a cópia em Parquet existe e não é mais antiga que o CSV."""
+        try:
+            return os.stat(self.database_parquet_file).st_mtime_ns >= os.stat(self.SCRAPING_DATABASE_FILE).st_mtime_ns
+        except OSError:
+            return False
+
+    def _get_database_signature(self) -> Optional[tuple]:
+        """
+        Identifica a versão do arquivo de base de dados em disco.
+        
+        Returns:
+            tuple: (mtime, tamanho) do arquivo, ou None se ele não existir
+        """
+        try:
+            stat = os.stat(self.SCRAPING_DATABASE_FILE)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _get_shared_snapshot(self) -> dict:
+        """Retorna o estado publicado para os demais workers."""
+        return {
+            "status": self.state.status,
+            "qtd_books_urls": self.state.qtd_books_urls,
+            "qtd_books_scraped": self.state.qtd_books_scraped,
+        }
+
+    def acquire_scraping_lock(self) -> bool:
+        """
+        Reserva o scraping para este processo, garantindo uma única execução entre workers.
+        
+        Não é concedido enquanto uma task deste processo ainda estiver em execução
+        (inclusive uma task que recebeu o pedido de parada e ainda não terminou).
+        
+        Returns:
+            bool: True se este processo pode iniciar o scraping
+        """
+        if not self.state.stopped_event.is_set():
+            return False
+        return self.shared.acquire(self._get_shared_snapshot())
+
+    def claim_scraping(self) -> bool:
+        """
+        Reserva atomicamente o início do scraping antes de agendar a task.
+        
+        A leitura do status e a sua alteração acontecem sob o mesmo lock, então duas
+        requisições simultâneas não conseguem iniciar dois scrapings.
+        
+        Returns:
+            bool: True se o scraping foi reservado para a próxima task
+        """
+        with self._start_lock:
+            return self._claim_scraping_locked()
+
+    def _claim_scraping_locked(self) -> bool:
+        """Reserva o scraping; deve ser chamado com _start_lock adquirido."""
+        if self._start_claimed or self.state.status != "Idle":
+            return False
+        
+        self.state.status = "Extracting_urls"
+        if not self.acquire_scraping_lock():
+            self.state.status = "Idle"
+            return False
+        
+        self._start_claimed = True
+        self.state.stopped_event.clear()
+        return True
+
+    def sync_shared_state(self) -> None:
+        """
+        Sincroniza o estado local com o scraping executado por outros workers.
+        
+        - Enquanto outro processo faz scraping, adota o status e contadores publicados por ele
+        - Quando a base em disco muda (gravada ou apagada por outro processo), recarrega os dados
+        
+        A verificação é feita no máximo uma vez a cada SHARED_STATE_INTERVAL_SECONDS.
+        """
+        now = time.monotonic()
+        if self.shared.is_owner or now - self._last_shared_sync < self.SHARED_STATE_INTERVAL_SECONDS:
+            return
+        if not self._shared_sync_lock.acquire(blocking=False):
+            return
+        
+        try:
+            self._last_shared_sync = now
+            
+            snapshot = self.shared.read()
+            if snapshot is not None and snapshot.get("status") in self.RUNNING_STATUSES + ("Stopping",):
+                self.state.status = snapshot["status"]
+                self.state.qtd_books_urls = snapshot.get("qtd_books_urls", 0)
+                self.state.qtd_books_scraped = snapshot.get("qtd_books_scraped", 0)
+                return
+            
+            signature = self._get_database_signature()
+            if signature != self._database_signature:
+                # Base gravada ou apagada por outro worker
+                self.state.books_dataframe = pd.DataFrame()
+                self.state.qtd_books_urls = 0
+                self.state.qtd_books_scraped = 0
+                self.clear_read_cache()
+                self.state.status = "Idle"
+                self.load_existing_data()
+            elif self.state.status in self.RUNNING_STATUSES + ("Stopping",) and self.state.stopped_event.is_set():
+                # Scraping de outro worker terminou sem alterar a base
+                self.state.status = "Done" if self.state.books_records else "Idle"
+        
+        finally:
+            self._shared_sync_lock.release()
+
+    def _publish_shared_state(self) -> None:
+        """
+        Publica periodicamente o progresso para os demais workers enquanto a task roda
+        e atende pedidos de parada feitos por eles.
+        """
+        while not self.state.stopped_event.wait(self.SHARED_STATE_INTERVAL_SECONDS):
+            if self.shared.stop_requested():
+                self.stop_scraping()
+            self.shared.publish(self._get_shared_snapshot())
+
+    def build_read_cache(self) -> None:
+        """
+        Pré-calcula as visões da base usadas pelas rotas de consulta.
+        
+        A base não muda depois que o scraping termina, então as respostas
+        são montadas uma única vez aqui em vez de a cada requisição.
+        """
+        self.state.categories_sorted = self.utils.extract_sorted_categories_from_dataframe(
+            self.state.books_dataframe
+        )
+        self.state.categories_json = orjson.dumps({"categories": self.state.categories_sorted})
+        
+        self.state.titles = self.utils.extract_books_titles_from_dataframe(self.state.books_dataframe)
+        self.state.titles_json = orjson.dumps(self.state.titles)
+        
+        self.state.titles_lower = [str(title).lower() for title in self.state.titles]
+        self.state.title_index = self.utils.build_title_index(self.state.titles_lower)
+        self.state.category_to_indices = self.utils.build_category_index(self.state.books_dataframe)
+        
+        self.state.books_records = self.utils.dataframe_to_records(self.state.books_dataframe)
+        self.state.books_json = [orjson.dumps(record) for record in self.state.books_records]
+        
+        # Identifica a versão da base para validação de cache HTTP (ETag)
+        dataset_hash = hashlib.blake2b(b"\n".join(self.state.books_json), digest_size=8).hexdigest()
+        self.state.dataset_etag = f'"{dataset_hash}"'
+
+    def clear_read_cache(self) -> None:
+        """Descarta as visões pré-calculadas da base."""
+        self.state.categories_sorted = []
+        self.state.categories_json = b""
+        self.state.titles = []
+        self.state.titles_json = b""
+        self.state.titles_lower = []
+        self.state.title_index = {}
+        self.state.category_to_indices = {}
+        self.state.books_records = []
+        self.state.books_json = []
+        self.state.dataset_etag = ""
+
     def get_status_message(self) -> str:
         """
         Retorna uma mensagem de status para o processo de web scraping.
@@ -65,7 +285,7 @@ class WebScraper:
             
         elif self.state.status == "Scraping_books":
             if self.state.qtd_books_urls > 0:
-                current_count = len(self.state.books_dataframe)
+                current_count = self.state.qtd_books_scraped
                 progress = self.utils.calculate_scraping_progress(current_count, self.state.qtd_books_urls)
                 return f"Coletando dados dos livros: {current_count}/{self.state.qtd_books_urls} ({progress:.1f}%). Aguarde a conclusão para acessar as funções de consulta."
             else:
@@ -89,58 +309,98 @@ class WebScraper:
         Returns:
             pd.DataFrame: DataFrame contendo os dados dos livros coletados
         """
+        # Consome a reserva feita por claim_scraping (ou reserva agora, se chamada diretamente)
+        with self._start_lock:
+            if not self._start_claimed and not self._claim_scraping_locked():
+                print("Scraping já está em execução.")
+                return None
+            self._start_claimed = False
+        
+        threading.Thread(target=self._publish_shared_state, daemon=True).start()
         try:
+            # Reset solicitado entre a reserva e o início da task
+            if self.state.status == "Stopping":
+                self.state.status = "Idle"
+                return None
+            
             # Inicializa o processo - Status: Extraindo URLs
-            self.state.status = "Extracting_urls"
             self.state.books_dataframe = pd.DataFrame()
             self.state.qtd_books_urls = 0
+            self.state.qtd_books_scraped = 0
+            self.clear_read_cache()
             
             # Obtém URLs de todos os livros (passa o estado para atualização em tempo real)
-            books_urls = self.utils.extract_all_books_urls(self.BASE_URL, self.html_parser, self.state)
-            
-            if not books_urls:
-                self.state.status = "Error"
-                return None
-            
-            # Atualiza status para scraping (qtd_books_urls já foi atualizado durante a extração)
-            self.state.status = "Scraping_books"
-            books_data_list = []
+            books_urls = self.utils.extract_all_books_urls(
+                self.BASE_URL, self.html_parser, self.state, session=self.session
+            )
             
-            # Processa cada livro
-            for index, book_url in enumerate(books_urls.keys()):
-                # Verifica se deve parar
+            # Verifica se foi solicitada a parada durante a extração das URLs
+            # A verificação e a troca de status são atômicas: uma parada simultânea não é sobrescrita
+            with self._status_lock:
                 if self.state.status == "Stopping":
                     self.state.status = "Idle"
                     return None
                 
-                # Extrai dados do livro
-                book_data = self._extract_single_book_data(book_url, index)
-                if book_data:
-                    books_data_list.append(book_data)
+                if not books_urls:
+                    self.state.status = "Error"
+                    return None
+                
+                # Atualiza status para scraping (qtd_books_urls já foi atualizado durante a extração)
+                self.state.status = "Scraping_books"
+            books_data_list = []
+            
+            # Os livros são baixados e extraídos em paralelo (a espera pela rede não bloqueia os demais)
+            # e os resultados são consumidos na ordem das URLs
+            executor = ThreadPoolExecutor(max_workers=self.BOOK_FETCH_WORKERS)
+            try:
+                books_results = executor.map(
+                    self._extract_single_book_data, books_urls.keys(), range(len(books_urls))
+                )
+                
+                # Processa cada livro
+                for book_data in books_results:
+                    # Verifica se deve parar
+                    if self.state.status == "Stopping":
+                        self.state.status = "Idle"
+                        return None
                     
-                # Atualiza o DataFrame temporariamente para mostrar progresso
-                self.state.books_dataframe = pd.DataFrame(books_data_list)
+                    # O progresso é acompanhado pelo contador; o DataFrame é montado uma única vez no final
+                    if book_data:
+                        books_data_list.append(book_data)
+                        self.state.qtd_books_scraped = len(books_data_list)
+            finally:
+                # Cancela os livros que ainda não começaram; os que estão em andamento terminam sozinhos
+                executor.shutdown(wait=False, cancel_futures=True)
             
             # Finaliza o processo
-            self.state.books_dataframe = pd.DataFrame(books_data_list)
+            self.state.books_dataframe = self.utils.convert_columns_to_category(pd.DataFrame(books_data_list))
+            self.build_read_cache()
             self.state.qtd_books_urls = len(self.state.books_dataframe)
-            self.state.status = "Done"
             
-            # Salva os dados
+            # Salva os dados (o status só passa para "Done" depois que o arquivo está completo)
             success = self.utils.save_dataframe_to_csv(
                 self.state.books_dataframe, 
                 self.SCRAPING_DATABASE_FILE
             )
+            self._database_signature = self._get_database_signature()
             
             if not success:
                 print("Aviso: Erro ao salvar dados em CSV, mas scraping foi concluído.")
+            else:
+                self.utils.save_dataframe_to_parquet(self.state.books_dataframe, self.database_parquet_file)
             
+            self.state.status = "Done"
             return self.state.books_dataframe
             
         except Exception as e:
             print(f"Erro durante o scraping: {e}")
             self.state.status = "Error"
             return None
+        
+        finally:
+            # Libera os demais workers e quem estiver aguardando a parada do scraping
+            self.shared.release()
+            self.state.stopped_event.set()
 
     def _extract_single_book_data(self, book_url: str, index: int) -> Optional[dict]:
         """
@@ -151,10 +411,14 @@ class WebScraper:
             index (int): Índice do livro na lista
             
         Returns:
-            dict: Dados do livro ou None se houver erro
+            dict: Dados do livro ou None se houver erro ou se a parada foi solicitada
         """
+        # Livros que começam depois do pedido de parada não fazem a requisição
+        if self.state.status == "Stopping":
+            return None
+        
         try:
-            soup = self.utils.extract_soup_from_url(book_url)
+            soup = self.utils.extract_soup_from_url(book_url, session=self.session)
             if soup is None:
                 return None
             
@@ -164,24 +428,61 @@ class WebScraper:
             print(f"Erro ao extrair dados do livro {book_url}: {e}")
             return None
 
+    def close(self) -> None:
+        """Fecha as conexões abertas pela sessão HTTP do scraper."""
+        self.session.close()
+
     def delete_database(self) -> bool:
         """
-        Deleta o arquivo de banco de dados CSV.
+        Deleta os arquivos da base de dados (CSV e cópia em Parquet).
         
         Returns:
             bool: True se deletou com sucesso, False caso contrário
         """
         success = self.utils.delete_file_if_exists(self.SCRAPING_DATABASE_FILE)
+        success = self.utils.delete_file_if_exists(self.database_parquet_file) and success
         
         if success:
             # Reset do estado
+            self._database_signature = None
             self.state.books_dataframe = pd.DataFrame()
             self.state.qtd_books_urls = 0
-            if self.state.status != "Running":
+            self.state.qtd_books_scraped = 0
+            self.clear_read_cache()
+            # Só volta para "Idle" se não houver task de scraping ainda em execução
+            if self.state.stopped_event.is_set():
                 self.state.status = "Idle"
                 
         return success
 
+    def search_book_positions(self, title: str = None, category: str = None) -> np.ndarray:
+        """
+        Pesquisa as posições dos livros na base com base no título e/ou categoria.
+        
+        Args:
+            title (str, optional): Título do livro para pesquisa
+            category (str, optional): Categoria do livro para pesquisa
+            
+        Returns:
+            np.ndarray: Posições (em ordem crescente) dos livros encontrados
+        """
+        # Os filtros usam os índices montados ao final do scraping e resultam em posições
+        positions = None
+        
+        if category:
+            positions = self.utils.search_category_index(self.state.category_to_indices, category)
+            
+        # A busca por título percorre apenas os livros das categorias encontradas
+        if title and (positions is None or len(positions) > 0):
+            positions = self.utils.search_title_index(
+                self.state.title_index, self.state.titles_lower, title, candidates=positions
+            )
+        
+        if positions is None:
+            return np.arange(len(self.state.books_records), dtype=np.int64)
+            
+        return positions
+
     def search_books(self, title: str = None, category: str = None) -> List[dict]:
         """
         Pesquisa livros no DataFrame com base no título e/ou categoria.
@@ -193,11 +494,24 @@ class WebScraper:
         Returns:
             List[dict]: Lista de dicionários contendo os dados dos livros encontrados
         """
-        return self.utils.search_books_in_dataframe(
-            self.state.books_dataframe, 
-            title=title, 
-            category=category
-        )
+        records = self.state.books_records
+        return [records[position] for position in self.search_book_positions(title, category).tolist()]
+
+    def get_books_json(self, positions: np.ndarray) -> bytes:
+        """
+        Monta a lista JSON dos livros nas posições informadas.
+        
+        Concatena o JSON de cada livro serializado ao final do scraping, sem
+        serializar os registros novamente.
+        
+        Args:
+            positions (np.ndarray): Posições dos livros na base
+            
+        Returns:
+            bytes: Lista JSON com os dados dos livros
+        """
+        books_json = self.state.books_json
+        return b"[" + b",".join([books_json[position] for position in positions.tolist()]) + b"]"
 
     def get_book_titles(self) -> List[str]:
         """
@@ -206,14 +520,41 @@ class WebScraper:
         Returns:
             List[str]: Lista com os títulos dos livros
         """
-        return self.utils.extract_books_titles_from_dataframe(self.state.books_dataframe)
+        return self.state.titles
 
     def stop_scraping(self) -> None:
         """
         Sinaliza para parar o processo de scraping.
+        
+        Se o scraping estiver rodando em outro worker, o pedido é repassado a ele.
+        """
+        with self._status_lock:
+            if self.state.status not in self.RUNNING_STATUSES:
+                return
+            if self.shared.is_owner:
+                self.state.status = "Stopping"
+                return
+        self.shared.request_stop()
+
+    def wait_until_stopped(self, timeout: float) -> bool:
         """
-        if self.state.status == "Running":
-            self.state.status = "Stopping"
+        Aguarda o fim da task de scraping, seja neste processo ou em outro worker.
+        
+        Args:
+            timeout (float): Tempo máximo de espera em segundos
+            
+        Returns:
+            bool: True se não há mais scraping em execução
+        """
+        if self.shared.is_owner:
+            return self.state.stopped_event.wait(timeout)
+        
+        deadline = time.monotonic() + timeout
+        while self.shared.read() is not None:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.2)
+        return True
 
     def reset_scraping(self) -> bool:
         """
@@ -222,17 +563,17 @@ class WebScraper:
         Returns:
             bool: True se resetou com sucesso
         """
-        # Para o scraping se estiver rodando
-        if self.state.status == "Running":
+        # Para o scraping se estiver rodando (ou aguardando a parada pedida antes)
+        if self.state.status in self.RUNNING_STATUSES + ("Stopping",):
             self.stop_scraping()
-            # Aguarda até parar (em implementação real, seria melhor usar threading)
-            while self.state.status == "Stopping":
-                pass
+            # Aguarda a task sinalizar que parou
+            if not self.wait_until_stopped(self.STOP_TIMEOUT_SECONDS):
+                return False
         
         # Limpa os dados
         success = self.delete_database()
         
-        if success:
+        if success and self.state.stopped_event.is_set():
             self.state.status = "Idle"
             
         return success